@@ -0,0 +1,119 @@
+import re
+from typing import Any, Dict, List, Optional, Set
+
+# Common shorthand seen in plant exports, expanded token by token before matching.
+# Mapping a token to "" drops it (e.g. "Unit No. 1" -> "1").
+ASSET_ABBREVIATIONS = {
+    "blr": "boiler",
+    "boil": "boiler",
+    "turb": "turbine",
+    "gen": "generator",
+    "unit": "",
+    "no": "",
+    "num": "",
+}
+
+# Splits on punctuation/whitespace and on letter/digit boundaries ("afbc1" -> "afbc", "1")
+_TOKEN_PATTERN = re.compile(r"[a-z]+|\d+")
+
+
+def tokenize_asset(value: str, abbreviations: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    Lowercases an asset string and splits it into alphanumeric tokens, expanding
+    abbreviations and stripping leading zeros from numbers ("Blr-01" -> ["boiler", "1"]).
+    """
+    if abbreviations is None:
+        abbreviations = ASSET_ABBREVIATIONS
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(value.lower()):
+        if token.isdigit():
+            token = token.lstrip("0") or "0"
+        else:
+            token = abbreviations.get(token, token)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def normalize_asset(value: str, abbreviations: Optional[Dict[str, str]] = None) -> str:
+    """Collapses an asset string into its case, whitespace and punctuation insensitive key."""
+    return "".join(tokenize_asset(value, abbreviations))
+
+
+def _primary_aliases(asset: Dict[str, Any], abbreviations: Dict[str, str]) -> Set[str]:
+    """The normalized `name` and `display_name` of a single ASSET_REGISTRY entry."""
+    aliases = {normalize_asset(asset["name"], abbreviations), normalize_asset(asset.get("display_name") or "", abbreviations)}
+    aliases.discard("")
+    return aliases
+
+
+def _derived_aliases(asset: Dict[str, Any], abbreviations: Dict[str, str]) -> Set[str]:
+    """Generates the initials, short form and type based aliases of a single ASSET_REGISTRY entry."""
+    name_tokens = tokenize_asset(asset["name"], abbreviations)
+    display_tokens = tokenize_asset(asset.get("display_name") or "", abbreviations)
+    numbers = [token for token in name_tokens + display_tokens if token.isdigit()]
+    number = numbers[-1] if numbers else ""
+
+    variants = set()
+
+    # Initials of the display name words, e.g. "Turbo Generator 1" -> "tg1"
+    words = [token for token in display_tokens if not token.isdigit()]
+    if words:
+        variants.add("".join(word[0] for word in words) + number)
+
+    # Display name without the tokens it shares with the name, e.g. "AFBC Boiler 1" -> "boiler1"
+    remaining = [token for token in display_tokens if token not in name_tokens]
+    if remaining and number:
+        variants.add("".join(remaining) + number)
+
+    # Asset type plus number, e.g. "turbine1"
+    if asset.get("type") and number:
+        variants.add(normalize_asset(asset["type"], abbreviations) + number)
+
+    variants.discard("")
+    return variants
+
+
+class AssetAliasIndex:
+    """
+    Precomputed lookup from normalized alias variants of ASSET_REGISTRY `name`/`display_name`
+    values to the canonical asset name.
+
+    The normalized `name`/`display_name` always win over derived variants (initials, short
+    forms, type plus number). Aliases shared by more than one asset at the same level are
+    dropped rather than guessed.
+    """
+
+    def __init__(self, asset_registry: List[Dict[str, Any]], abbreviations: Optional[Dict[str, str]] = None):
+        self.abbreviations = ASSET_ABBREVIATIONS if abbreviations is None else abbreviations
+        self.aliases: Dict[str, str] = {}
+
+        primary = self._collect(asset_registry, _primary_aliases)
+        derived = self._collect(asset_registry, _derived_aliases)
+        self.aliases.update(derived)
+        # Applied last so an exact name/display_name match overrides any derived alias
+        self.aliases.update(primary)
+
+    def _collect(self, asset_registry: List[Dict[str, Any]], alias_fn) -> Dict[str, str]:
+        """Maps each alias produced by `alias_fn` to its asset, dropping ambiguous ones."""
+        aliases = {}
+        ambiguous = set()
+        for asset in asset_registry:
+            for alias in alias_fn(asset, self.abbreviations):
+                existing = aliases.get(alias)
+                if existing is not None and existing != asset["name"]:
+                    ambiguous.add(alias)
+                aliases[alias] = asset["name"]
+
+        for alias in ambiguous:
+            del aliases[alias]
+        return aliases
+
+    def resolve(self, value: str) -> Optional[str]:
+        """
+        Resolves a raw asset string to its canonical registry name.
+
+        Returns:
+            The canonical asset name, or None if the value matches no alias.
+        """
+        return self.aliases.get(normalize_asset(value, self.abbreviations))
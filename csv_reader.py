@@ -0,0 +1,116 @@
+import codecs
+import csv
+import os
+from io import TextIOWrapper
+from typing import Any, BinaryIO, Iterator, Optional, Tuple
+
+# Number of bytes read up-front to detect the encoding and delimiter
+SNIFF_SAMPLE_SIZE = 64 * 1024
+
+CSV_DELIMITERS = ",;\t|"
+
+# Tried in order when the sample carries no BOM; latin-1 never fails so it is the last resort
+FALLBACK_ENCODINGS = ("utf-8", "cp1252", "latin-1")
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Detects the text encoding of a CSV sample from its BOM, or by trial decoding.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            # final=False tolerates a multi-byte character cut off at the end of the sample
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def detect_delimiter(sample_text: str, default: str = ",") -> str:
+    """
+    Detects the delimiter of a CSV sample using csv.Sniffer, falling back to `default`.
+    """
+    # Only hand complete lines to the sniffer so a truncated last row does not skew it
+    if "\n" in sample_text:
+        sample_text = sample_text[:sample_text.rindex("\n")]
+    try:
+        return csv.Sniffer().sniff(sample_text, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        return default
+
+
+class CsvWorksheet:
+    """
+    Read-only, streaming stand-in for an openpyxl Worksheet backed by a CSV/TSV file.
+
+    Implements the `title` and `iter_rows(values_only=True)` surface used by
+    find_header_row_index and extract_and_parse_data. Cells are yielded as the exact field
+    text (None for blank fields), so raw values and asset identifiers such as "007" are kept
+    verbatim. Every `iter_rows` call re-reads the underlying binary stream from the start,
+    so reading uses one row of memory regardless of the file size.
+    """
+
+    def __init__(self, stream: BinaryIO, title: str, encoding: str, delimiter: str):
+        self.stream = stream
+        self.title = title
+        self.encoding = encoding
+        self.delimiter = delimiter
+
+    def iter_rows(
+        self,
+        min_row: Optional[int] = None,
+        max_row: Optional[int] = None,
+        values_only: bool = True
+    ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Yields row value tuples between the 1-indexed `min_row` and `max_row` (inclusive).
+        """
+        if not values_only:
+            raise ValueError("CsvWorksheet only supports iterating row values (values_only=True).")
+
+        min_row = min_row or 1
+        self.stream.seek(0)
+        text_stream = TextIOWrapper(self.stream, encoding=self.encoding, errors="replace", newline="")
+        try:
+            for row_idx, fields in enumerate(csv.reader(text_stream, delimiter=self.delimiter), start=1):
+                if max_row is not None and row_idx > max_row:
+                    break
+                if row_idx < min_row:
+                    continue
+                yield tuple(field if field.strip() else None for field in fields)
+        finally:
+            # Detach so closing the wrapper does not close the caller's stream
+            text_stream.detach()
+
+
+def open_csv_worksheet(stream: BinaryIO, filename: str) -> CsvWorksheet:
+    """
+    Sniffs the encoding and delimiter of a seekable CSV/TSV binary stream and wraps it
+    in a CsvWorksheet titled after the file name.
+
+    Args:
+        stream (BinaryIO): Seekable binary stream of the uploaded file.
+        filename (str): Original file name, used for the title and the default delimiter.
+
+    Returns:
+        CsvWorksheet: A streaming worksheet over the file.
+    """
+    stream.seek(0)
+    sample = stream.read(SNIFF_SAMPLE_SIZE)
+    if not sample.strip():
+        raise ValueError("The uploaded CSV file is empty.")
+
+    encoding = detect_encoding(sample)
+    sample_text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample, final=False)
+
+    title, extension = os.path.splitext(os.path.basename(filename))
+    default_delimiter = "\t" if extension.lower() == ".tsv" else ","
+    delimiter = detect_delimiter(sample_text, default=default_delimiter)
+
+    return CsvWorksheet(stream=stream, title=title, encoding=encoding, delimiter=delimiter)
@@ -1,11 +1,174 @@
 import logging
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from openpyxl.worksheet.worksheet import Worksheet
 
-from schemas import LLMHeaderMapping, ParseResponse, ParsedDataPoint, UnmappedColumn
+from asset_resolver import AssetAliasIndex
+from registries import ASSET_REGISTRY, PARAM_REGISTRY
+from schemas import LLMHeaderMapping, ParseResponse, ParsedDataPoint, UnmappedColumn, WarningRecord
+from validation_rules import CELL_TEMPLATES, SUMMARY_TEMPLATES, ColumnValidator, compile_registry_validators
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of offending values kept as examples on each aggregated warning
+MAX_WARNING_EXAMPLES = 5
+
+# Maximum number of compressed row ranges stored on each aggregated warning
+MAX_WARNING_ROW_RANGES = 20
+
+# Maximum number of row ranges spelled out in a warning's summary string
+MAX_SUMMARY_ROW_RANGES = 5
+
+class RowLimitExceededError(ValueError):
+    """Raised when a sheet has more non-empty data rows than the caller allows."""
+
+
+# Alias index over the default ASSET_REGISTRY, built once at import
+DEFAULT_ASSET_INDEX = AssetAliasIndex(ASSET_REGISTRY)
+
+# Validators for the default PARAM_REGISTRY, compiled once at import
+DEFAULT_VALIDATORS = compile_registry_validators(PARAM_REGISTRY)
+
+
+class WarningAggregator:
+    """
+    Collects repeated parser warnings into one WarningRecord per (code, param, asset, column)
+    instead of one formatted string per offending cell.
+    
+    Rows are expected to arrive in ascending order (as they do from the row loop) so that
+    consecutive rows can be folded into a single inclusive range in O(1). Only the first
+    `max_row_ranges` ranges are stored; `range_count` keeps the true total.
+    """
+
+    def __init__(
+        self,
+        sheet_name: Optional[str],
+        max_examples: int = MAX_WARNING_EXAMPLES,
+        max_row_ranges: int = MAX_WARNING_ROW_RANGES
+    ):
+        self.sheet_name = sheet_name
+        self.max_examples = max_examples
+        self.max_row_ranges = max_row_ranges
+        self._records: Dict[Tuple[Any, ...], WarningRecord] = {}
+        # Last row seen per record, still needed to merge ranges once storage is capped
+        self._last_rows: Dict[Tuple[Any, ...], int] = {}
+
+    def add(
+        self,
+        code: str,
+        param_name: Optional[str] = None,
+        asset_name: Optional[str] = None,
+        col: Optional[int] = None,
+        row: Optional[int] = None,
+        example: Optional[str] = None,
+        limit: Optional[float] = None,
+    ) -> WarningRecord:
+        """Registers a single occurrence of a warning and returns its aggregated record."""
+        key = (code, param_name, asset_name, col)
+        record = self._get_record(key, limit)
+        record.count += 1
+        
+        if row is not None:
+            last_row = self._last_rows.get(key)
+            ranges = record.row_ranges
+            if last_row is not None and last_row + 1 == row:
+                # Only the last range is extended, and only if it was stored
+                if record.range_count == len(ranges):
+                    ranges[-1] = (ranges[-1][0], row)
+            elif last_row != row:
+                record.range_count += 1
+                if len(ranges) < self.max_row_ranges:
+                    ranges.append((row, row))
+                else:
+                    record.row_ranges_truncated = True
+            self._last_rows[key] = row
+                
+        if example is not None and len(record.examples) < self.max_examples:
+            record.examples.append(example)
+            
+        return record
+
+    def add_column(
+        self,
+        code: str,
+        col: int,
+        param_name: Optional[str] = None,
+        asset_name: Optional[str] = None,
+        example: Optional[str] = None,
+    ) -> WarningRecord:
+        """
+        Registers a column on a warning that spans several columns (e.g. duplicate mappings)
+        and returns its aggregated record. Each column is counted once.
+        """
+        key = (code, param_name, asset_name, None)
+        record = self._get_record(key)
+        if col not in record.columns:
+            record.columns.append(col)
+            record.count += 1
+            if example is not None and len(record.examples) < self.max_examples:
+                record.examples.append(example)
+        return record
+
+    def _get_record(self, key: Tuple[Any, ...], limit: Optional[float] = None) -> WarningRecord:
+        """Returns the record for `key`, creating an empty one on first sight."""
+        record = self._records.get(key)
+        if record is None:
+            code, param_name, asset_name, col = key
+            record = WarningRecord(
+                code=code,
+                sheet_name=self.sheet_name,
+                param_name=param_name,
+                asset_name=asset_name,
+                columns=[col] if col is not None else [],
+                limit=limit,
+            )
+            self._records[key] = record
+        return record
+
+    def records(self) -> List[WarningRecord]:
+        """Returns the aggregated records in first-seen order."""
+        return list(self._records.values())
+
+
+def format_row_ranges(row_ranges: List[Tuple[int, int]], range_count: Optional[int] = None, max_ranges: int = MAX_SUMMARY_ROW_RANGES) -> str:
+    """
+    Renders compressed row ranges as a short human readable string, e.g. "3, 7-12 and 4 more".
+    `range_count` is the total number of ranges when `row_ranges` holds only the first few.
+    """
+    if range_count is None:
+        range_count = len(row_ranges)
+    parts = [str(start) if start == end else f"{start}-{end}" for start, end in row_ranges[:max_ranges]]
+    text = ", ".join(parts)
+    shown = min(len(row_ranges), max_ranges)
+    if range_count > shown:
+        text += f" and {range_count - shown} more"
+    return text
+
+
+def summarize_warning(record: WarningRecord) -> str:
+    """Builds the single summary string shown in `warnings` for an aggregated record."""
+    if record.code == "duplicate_mapping":
+        cols = ", ".join(str(col) for col in record.columns)
+        if record.asset_name:
+            return f"Duplicate mapping detected: Columns {cols} are all mapped to parameter '{record.param_name}' for asset '{record.asset_name}'."
+        return f"Duplicate mapping detected: Columns {cols} are all mapped to parameter '{record.param_name}'."
+        
+    if record.code == "unresolved_asset":
+        examples = ", ".join(f"'{example}'" for example in record.examples)
+        return (
+            f"Asset Warning: Column {record.columns[0]} has {record.count} row(s) with asset identifiers "
+            f"not found in the Asset Registry (e.g. {examples})."
+        )
+        
+    if record.code in SUMMARY_TEMPLATES:
+        description = SUMMARY_TEMPLATES[record.code].format(limit=record.limit)
+        return (
+            f"Validation Warning: Column {record.columns[0]} has {record.count} {description} "
+            f"for '{record.param_name}' (rows {format_row_ranges(record.row_ranges, record.range_count)})."
+        )
+        
+    return f"{record.code}: {record.count} occurrence(s) for '{record.param_name}'."
+
 
 def parse_cell_value(raw_val: Any) -> Optional[float]:
     """
@@ -53,47 +216,115 @@ def parse_cell_value(raw_val: Any) -> Optional[float]:
         return None
 
 
-def extract_and_parse_data(worksheet: Worksheet, header_row_index: int, mapping_result: LLMHeaderMapping) -> ParseResponse:
+def extract_and_parse_data(
+    worksheet: Worksheet,
+    header_row_index: int,
+    mapping_result: LLMHeaderMapping,
+    validators: Optional[Dict[str, ColumnValidator]] = None,
+    asset_index: Optional[AssetAliasIndex] = None,
+    verbose_warnings: bool = False,
+    max_warning_examples: int = MAX_WARNING_EXAMPLES,
+    max_warning_row_ranges: int = MAX_WARNING_ROW_RANGES,
+    max_rows: Optional[int] = None
+) -> ParseResponse:
     """
     Iterates through rows beneath the header row, parsing values deterministically
     based on the LLM mapping results.
     
+    Physical validation rules come from the `validation` metadata of the parameter registry,
+    compiled once up front (DEFAULT_VALIDATORS, or the `validators` passed in) and evaluated
+    over each whole parsed column after the row loop.
+    
+    Values of an `_asset_identifier_` column are resolved to canonical ASSET_REGISTRY names
+    through the alias index, once per distinct value in the sheet. Unresolvable values are
+    kept as-is and flagged with `unresolved_asset`. The sheet title, used as the asset when a
+    row has no identifier, goes through the same index and flag; an unresolved title only sets
+    the flag and does not add an `unresolved_asset` warning record.
+    
+    Validation and duplicate mapping issues are aggregated into one WarningRecord per
+    sheet/parameter/column (exposed as `warning_details`) with a single summary string
+    each in `warnings`. The legacy per-cell strings are only emitted when `verbose_warnings` is set.
+    
     Args:
-        worksheet (Worksheet): The openpyxl Worksheet object.
+        worksheet (Worksheet): The openpyxl Worksheet (or streaming CsvWorksheet) object.
         header_row_index (int): 1-indexed row number of the true headers.
         mapping_result (LLMHeaderMapping): The structured response from the LLM.
+        validators (Dict[str, ColumnValidator]): Precompiled validators keyed by parameter name
+            (see compile_registry_validators). Defaults to the compiled PARAM_REGISTRY.
+        asset_index (AssetAliasIndex): Alias index used to canonicalize row asset identifiers. Defaults to ASSET_REGISTRY.
+        verbose_warnings (bool): Emit one warning string per offending cell instead of per record.
+        max_warning_examples (int): Cap on example values kept on each aggregated warning.
+        max_warning_row_ranges (int): Cap on row ranges kept on each aggregated warning.
+        max_rows (int): Maximum number of non-empty data rows to accept; None means unlimited.
         
     Returns:
         ParseResponse: structured representation of the parsed excel sheet.
+        
+    Raises:
+        RowLimitExceededError: If the sheet has more than `max_rows` non-empty data rows.
     """
     parsed_data = []
     needs_review = []
     unmapped_columns = []
     warnings = []
+    aggregator = WarningAggregator(
+        sheet_name=worksheet.title,
+        max_examples=max_warning_examples,
+        max_row_ranges=max_warning_row_ranges
+    )
     
     # 0-indexed translation for final JSON schema
     zero_indexed_header_row = header_row_index - 1
     if header_row_index > 1:
         warnings.append(f"Row(s) 1 to {header_row_index - 1} appear to be title/metadata rows, skipped.")
         
+    registry_validators = validators if validators is not None else DEFAULT_VALIDATORS
+    if asset_index is None:
+        asset_index = DEFAULT_ASSET_INDEX
+    # Memoized canonical names for each distinct raw asset identifier in this sheet
+    resolved_assets = {}
+    
+    # Fallback asset for rows without an identifier, resolved once per sheet. Kept out of
+    # `resolved_assets` so a row value equal to the title is still reported when first seen.
+    title_asset = asset_index.resolve(worksheet.title)
+    default_asset_name = title_asset if title_asset is not None else worksheet.title
+    default_asset_unresolved = title_asset is None
+    
     # Map out which columns have a canonical parameter to avoid re-checking inside the row loop
     mapped_cols = {}
+    # Parsed values (NaN for empty cells) and their data points for each column with validation rules
+    column_values = {}
+    column_points = {}
     asset_col_idx = None
-    seen_mappings = set()
+    seen_mappings = {}
     for col_idx, mapping in enumerate(mapping_result.mappings):
         if mapping.canonical_parameter == "_asset_identifier_":
             asset_col_idx = col_idx
         elif mapping.canonical_parameter:
             mapped_cols[col_idx] = mapping
+            if mapping.canonical_parameter in registry_validators:
+                column_values[col_idx] = []
+                column_points[col_idx] = []
             
             mapping_key = (mapping.canonical_parameter, mapping.asset_name)
             if mapping_key in seen_mappings:
-                if mapping.asset_name:
-                    warnings.append(f"Duplicate mapping detected: Multiple columns mapped to parameter '{mapping.canonical_parameter}' for asset '{mapping.asset_name}'.")
-                else:
-                    warnings.append(f"Duplicate mapping detected: Multiple columns mapped to parameter '{mapping.canonical_parameter}'.")
+                if verbose_warnings:
+                    if mapping.asset_name:
+                        warnings.append(f"Duplicate mapping detected: Multiple columns mapped to parameter '{mapping.canonical_parameter}' for asset '{mapping.asset_name}'.")
+                    else:
+                        warnings.append(f"Duplicate mapping detected: Multiple columns mapped to parameter '{mapping.canonical_parameter}'.")
+                        
+                # One record per (parameter, asset) listing every column involved
+                for dup_col_idx in (seen_mappings[mapping_key], col_idx):
+                    aggregator.add_column(
+                        code="duplicate_mapping",
+                        col=dup_col_idx,
+                        param_name=mapping.canonical_parameter,
+                        asset_name=mapping.asset_name,
+                        example=mapping_result.mappings[dup_col_idx].original_header
+                    )
             else:
-                seen_mappings.add(mapping_key)
+                seen_mappings[mapping_key] = col_idx
         else:
             unmapped_columns.append(UnmappedColumn(
                 sheet_name=worksheet.title,
@@ -102,6 +333,8 @@ def extract_and_parse_data(worksheet: Worksheet, header_row_index: int, mapping_
                 reason="No matching parameter found"
             ))
             
+    data_rows = 0
+    
     # Iterate through row values skipping the header row
     # start=header_row_index effectively means the first data row will have 0-indexed row mapping
     # since data starts at header_row_index + 1 (1-indexed), which is header_row_index (0-indexed).
@@ -114,12 +347,37 @@ def extract_and_parse_data(worksheet: Worksheet, header_row_index: int, mapping_
         if is_empty_row:
             continue
             
+        data_rows += 1
+        if max_rows is not None and data_rows > max_rows:
+            raise RowLimitExceededError(f"Sheet '{worksheet.title}' has more than {max_rows} data rows.")
+            
         # Determine row-level asset name
-        row_asset_name = worksheet.title
+        row_asset_name = default_asset_name
+        row_asset_unresolved = default_asset_unresolved
         if asset_col_idx is not None and asset_col_idx < len(row):
             val = row[asset_col_idx]
             if val is not None and str(val).strip():
-                row_asset_name = str(val).strip()
+                raw_asset = str(val).strip()
+                is_new_asset = raw_asset not in resolved_assets
+                if is_new_asset:
+                    resolved_assets[raw_asset] = asset_index.resolve(raw_asset)
+                    
+                canonical_asset = resolved_assets[raw_asset]
+                if canonical_asset is not None:
+                    row_asset_name = canonical_asset
+                    row_asset_unresolved = False
+                else:
+                    row_asset_name = raw_asset
+                    row_asset_unresolved = True
+                    # Only distinct values are kept as examples
+                    aggregator.add(
+                        code="unresolved_asset",
+                        col=asset_col_idx,
+                        row=row_idx,
+                        example=raw_asset if is_new_asset else None
+                    )
+                    if verbose_warnings and is_new_asset:
+                        warnings.append(f"Asset Warning: Row {row_idx}, Column {asset_col_idx} asset identifier '{raw_asset}' could not be resolved against the Asset Registry.")
             
         # Iterate over cells horizontally
         for col_idx, raw_val in enumerate(row):
@@ -138,17 +396,13 @@ def extract_and_parse_data(worksheet: Worksheet, header_row_index: int, mapping_
             # Form clean raw representation
             raw_str = str(raw_val).strip() if raw_val is not None else ""
             
-            # Physical validation logic for impossible negative values
-            if parsed_val is not None and parsed_val < 0:
-                if mapping.canonical_parameter in ("coal_consumption", "steam_generation", "power_generation", "water_flow_rate", "emissions_co2"):
-                    warnings.append(f"Validation Warning: Row {row_idx}, Column {col_idx} has a negative value ({parsed_val}) for '{mapping.canonical_parameter}'.")
-            
             data_point = ParsedDataPoint(
                 sheet_name=worksheet.title,
                 row=row_idx,
                 col=col_idx,
                 param_name=mapping.canonical_parameter,
                 asset_name=mapping.asset_name if mapping.asset_name else row_asset_name,
+                unresolved_asset=False if mapping.asset_name else row_asset_unresolved,
                 raw_value=raw_str,
                 parsed_value=parsed_val,
                 confidence=mapping.confidence
@@ -158,6 +412,48 @@ def extract_and_parse_data(worksheet: Worksheet, header_row_index: int, mapping_
                 needs_review.append(data_point)
             else:
                 parsed_data.append(data_point)
+                
+            # Defer physical validation to the vectorized column pass below
+            if col_idx in column_values:
+                column_values[col_idx].append(np.nan if parsed_val is None else parsed_val)
+                column_points[col_idx].append(data_point)
+                
+    # Physical validation over whole parsed columns
+    for col_idx, values in column_values.items():
+        mapping = mapped_cols[col_idx]
+        points = column_points[col_idx]
+        validator = registry_validators[mapping.canonical_parameter]
+        
+        # Group readings by row asset so row-to-row rules never compare different assets
+        groups = None
+        if validator.needs_groups and asset_col_idx is not None and not mapping.asset_name:
+            asset_codes = {}
+            groups = np.array([asset_codes.setdefault(point.asset_name, len(asset_codes)) for point in points], dtype=np.int64)
+            
+        for code, limit, positions in validator.check(np.array(values, dtype=float), groups):
+            for pos in positions:
+                data_point = points[pos]
+                aggregator.add(
+                    code=code,
+                    param_name=mapping.canonical_parameter,
+                    asset_name=mapping.asset_name,
+                    col=col_idx,
+                    row=data_point.row,
+                    example=data_point.raw_value,
+                    limit=limit
+                )
+                if verbose_warnings:
+                    warnings.append(CELL_TEMPLATES[code].format(
+                        row=data_point.row,
+                        col=col_idx,
+                        value=data_point.parsed_value,
+                        limit=limit,
+                        param=mapping.canonical_parameter
+                    ))
+                
+    warning_details = aggregator.records()
+    if not verbose_warnings:
+        warnings.extend(summarize_warning(record) for record in warning_details)
             
     return ParseResponse(
         status="success",
@@ -165,5 +461,7 @@ def extract_and_parse_data(worksheet: Worksheet, header_row_index: int, mapping_
         parsed_data=parsed_data,
         needs_review=needs_review,
         unmapped_columns=unmapped_columns,
-        warnings=warnings
+        warnings=warnings,
+        warning_details=warning_details,
+        data_rows=data_rows
     )
@@ -0,0 +1,211 @@
+"""
+Local stand-in for the Gemini `generateContent` REST endpoint used by `map_headers`.
+
+Point the backend at it with GEMINI_BASE_URL=http://127.0.0.1:<port> (any GEMINI_API_KEY works).
+Latency, error rate and the canned header mappings are configurable so /parse can be
+load tested without depending on the live API:
+
+    python fake_gemini.py --port 8081 --latency lognormal --latency-ms 800 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from registries import ASSET_REGISTRY, PARAM_REGISTRY
+from schemas import ColumnMapping, LLMHeaderMapping
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal")
+
+# Canned answers for the headers produced by create_test_data.py and load_test.py.
+# Values are (canonical_parameter, asset_name, confidence).
+DEFAULT_CANNED_MAPPINGS = {
+    "Equipment ID": ("_asset_identifier_", None, "high"),
+    "Unit ID": ("_asset_identifier_", None, "high"),
+    "Total Coal Used (Metric Tons)": ("coal_consumption", None, "high"),
+    "Gen. Output [MW]": ("power_generation", None, "high"),
+    "Power Output": ("power_generation", None, "medium"),
+    "MW Generated": ("power_generation", None, "low"),
+    "Temp (Celsius)": ("operating_temperature", None, "high"),
+    "Water In (LPH)": ("water_flow_rate", None, "high"),
+    "Carbon Output": ("emissions_co2", None, "medium"),
+    "Op. Efficiency (%)": ("efficiency", None, "high"),
+    "Steam (Boiler 2)": ("steam_generation", "AFBC-2", "high"),
+}
+
+
+class FakeGeminiConfig:
+    """Latency, error and response behaviour of the fake Gemini server."""
+
+    def __init__(
+        self,
+        latency: str = "constant",
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        canned_mappings: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None
+    ):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{latency}'. Expected one of {LATENCY_DISTRIBUTIONS}.")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.canned_mappings = DEFAULT_CANNED_MAPPINGS if canned_mappings is None else canned_mappings
+        self.rng = random.Random(seed)
+
+    def sample_latency(self) -> float:
+        """
+        Draws a response delay in seconds.
+
+        `latency_ms` is the mean and `latency_jitter_ms` the spread: half-width for uniform,
+        standard deviation for normal and lognormal.
+        """
+        mean = self.latency_ms
+        jitter = self.latency_jitter_ms
+        if self.latency == "uniform":
+            delay = self.rng.uniform(mean - jitter, mean + jitter)
+        elif self.latency == "normal":
+            delay = self.rng.gauss(mean, jitter)
+        elif self.latency == "lognormal" and mean > 0:
+            # Pick mu/sigma so the distribution has the requested mean and standard deviation
+            sigma = math.sqrt(math.log(1.0 + (jitter / mean) ** 2))
+            delay = self.rng.lognormvariate(math.log(mean) - sigma ** 2 / 2.0, sigma)
+        else:
+            delay = mean
+        return max(delay, 0.0) / 1000.0
+
+
+def _registry_lookup() -> Dict[str, str]:
+    """Maps registry names and display names (lowercased) to the canonical parameter name."""
+    lookup = {}
+    for param in PARAM_REGISTRY:
+        lookup[param["name"].lower()] = param["name"]
+        lookup[param["display_name"].lower()] = param["name"]
+    lookup["asset_name"] = "_asset_identifier_"
+    return lookup
+
+
+def build_mapping(headers: List[str], canned_mappings: Dict[str, Any]) -> LLMHeaderMapping:
+    """
+    Builds the LLMHeaderMapping a well behaved model would return for `headers`.
+
+    Canned entries win; otherwise headers that literally match a registry name or display
+    name are mapped with high confidence and everything else is left unmapped.
+    """
+    registry_lookup = _registry_lookup()
+    asset_names = {asset["name"] for asset in ASSET_REGISTRY}
+    mappings = []
+    for header in headers:
+        canned = canned_mappings.get(header)
+        if canned is not None:
+            parameter, asset_name, confidence = canned
+            if asset_name is not None and asset_name not in asset_names:
+                asset_name = None
+        else:
+            parameter = registry_lookup.get(header.strip().lower())
+            asset_name = None
+            confidence = "high"
+        mappings.append(ColumnMapping(
+            original_header=header,
+            canonical_parameter=parameter,
+            asset_name=asset_name,
+            confidence=confidence
+        ))
+    return LLMHeaderMapping(mappings=mappings)
+
+
+def extract_headers(payload: Dict[str, Any]) -> List[str]:
+    """Pulls the JSON header list out of the user prompt that `map_headers` sends."""
+    for content in payload.get("contents", []):
+        for part in content.get("parts", []):
+            text = part.get("text", "")
+            if "[" in text:
+                try:
+                    return json.loads(text[text.index("["):])
+                except ValueError:
+                    continue
+    return []
+
+
+def create_fake_gemini_app(config: FakeGeminiConfig) -> FastAPI:
+    """Creates the FastAPI app that answers `models/{model}:generateContent` calls."""
+    app = FastAPI(title="Fake Gemini API")
+    app.state.config = config
+    app.state.request_count = 0
+
+    @app.post("/{api_version}/models/{model_action}")
+    async def generate_content(api_version: str, model_action: str, request: Request):
+        app.state.request_count += 1
+        await asyncio.sleep(config.sample_latency())
+
+        if config.rng.random() < config.error_rate:
+            return JSONResponse(
+                status_code=config.error_status,
+                content={"error": {"code": config.error_status, "message": "Injected fake Gemini failure.", "status": "UNAVAILABLE"}}
+            )
+
+        model, _, action = model_action.partition(":")
+        if action != "generateContent":
+            return JSONResponse(status_code=404, content={"error": {"code": 404, "message": f"Unsupported action '{action}'.", "status": "NOT_FOUND"}})
+
+        headers = extract_headers(await request.json())
+        mapping = build_mapping(headers, config.canned_mappings)
+        return {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": mapping.model_dump_json()}]},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "modelVersion": model,
+            "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0}
+        }
+
+    @app.get("/stats")
+    def stats():
+        return {"requests": app.state.request_count}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Gemini generateContent server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="constant")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean response latency.")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0, help="Latency spread for non-constant distributions.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with --error-status.")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--mappings", help="JSON file of {header: [canonical_parameter, asset_name, confidence]} overrides.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    canned_mappings = None
+    if args.mappings:
+        with open(args.mappings) as f:
+            canned_mappings = {**DEFAULT_CANNED_MAPPINGS, **{header: tuple(value) for header, value in json.load(f).items()}}
+
+    config = FakeGeminiConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        canned_mappings=canned_mappings,
+        seed=args.seed
+    )
+    uvicorn.run(create_fake_gemini_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import json
 import logging
 import os
 from typing import List, Dict, Any
+import httpx
 from google import genai
 from google.genai import types
 from dotenv import load_dotenv
@@ -13,8 +14,25 @@ logger = logging.getLogger(__name__)
 # Load the .env file
 load_dotenv()
 
-# Assumes GEMINI_API_KEY is available in the environment variables
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+# Assumes GEMINI_API_KEY is available in the environment variables.
+# GEMINI_BASE_URL optionally points the client elsewhere (e.g. the local fake_gemini.py server used for load tests)
+# and GEMINI_MAX_CONNECTIONS caps the async connection pool (httpx default: 100).
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL")
+GEMINI_MAX_CONNECTIONS = os.environ.get("GEMINI_MAX_CONNECTIONS")
+
+http_options = {}
+if GEMINI_BASE_URL:
+    http_options["base_url"] = GEMINI_BASE_URL
+if GEMINI_MAX_CONNECTIONS:
+    max_connections = int(GEMINI_MAX_CONNECTIONS)
+    http_options["async_client_args"] = {
+        "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    }
+
+client = genai.Client(
+    api_key=os.environ.get("GEMINI_API_KEY"),
+    http_options=types.HttpOptions(**http_options) if http_options else None
+)
 
 SYSTEM_PROMPT = """You are an expert industrial data mapping AI.
 Your task is to analyze a list of messy column headers extracted from a factory's operational Excel spreadsheet and map each header to a strict Canonical Parameter Name and an optional Asset Name.
@@ -40,6 +58,25 @@ Asset Registry:
    - For unmappable columns, use "high" confidence if it's clearly a comment/date column, or "low" if you're unsure if it applies.
 """
 
+# Registry keys used only by the deterministic extractor, never sent to the LLM
+PROMPT_EXCLUDED_KEYS = ("validation",)
+
+
+def build_system_prompt(param_registry: List[Dict[str, Any]], asset_registry: List[Dict[str, Any]]) -> str:
+    """
+    Injects the registries into SYSTEM_PROMPT, leaving out extractor-only metadata such as
+    the `validation` rules so they do not change the prompt or its token cost.
+    """
+    prompt_params = [
+        {key: value for key, value in param.items() if key not in PROMPT_EXCLUDED_KEYS}
+        for param in param_registry
+    ]
+    return SYSTEM_PROMPT.format(
+        param_registry=json.dumps(prompt_params, indent=2),
+        asset_registry=json.dumps(asset_registry, indent=2)
+    )
+
+
 async def map_headers(
     headers: List[str],
     param_registry: List[Dict[str, Any]],
@@ -56,15 +93,8 @@ async def map_headers(
     Returns:
         LLMHeaderMapping: A strictly typed Pydantic model containing the mappings.
     """
-    # Stringify the registries for injection
-    param_str = json.dumps(param_registry, indent=2)
-    asset_str = json.dumps(asset_registry, indent=2)
-    
     # Construct the final system prompt with the registries injected
-    formatted_system_prompt = SYSTEM_PROMPT.format(
-        param_registry=param_str,
-        asset_registry=asset_str
-    )
+    formatted_system_prompt = build_system_prompt(param_registry, asset_registry)
     
     # We pass the raw headers as a JSON array string to the user prompt
     user_prompt = f"Please map the following extracted column headers:\n{json.dumps(headers, indent=2)}"
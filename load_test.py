@@ -0,0 +1,314 @@
+"""
+End-to-end load test for the /parse endpoint against a local fake Gemini server.
+
+Spawns fake_gemini.py and the FastAPI app (uvicorn with the requested worker count, Gemini
+client connection pool and threadpool size), uploads generated workbooks at each concurrency
+level and reports throughput, p50/p95/p99 latency and the peak RSS of the app process tree:
+
+    python load_test.py --workers 2 --gemini-max-connections 20 --threadpool-size 16 --concurrency 1 4 16 --requests 64 --rows 2000 --latency-ms 800
+"""
+import argparse
+import asyncio
+import csv
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from io import BytesIO, StringIO
+from typing import Dict, List, Optional
+
+import httpx
+from openpyxl import Workbook
+
+from fake_gemini import LATENCY_DISTRIBUTIONS
+
+# Headers known to the fake server's canned mappings, mirroring messy_data.xlsx
+LOAD_TEST_HEADERS = [
+    "Equipment ID",
+    "Total Coal Used (Metric Tons)",
+    "Gen. Output [MW]",
+    "Temp (Celsius)",
+    "Water In (LPH)",
+    "Carbon Output",
+    "Op. Efficiency (%)",
+    "Misc Notes",
+]
+
+LOAD_TEST_ASSETS = ["Boiler 1", "AFBC-2", "TG 1", "Cooling-Tower"]
+
+
+def generate_rows(rows: int, seed: int = 0) -> List[List[object]]:
+    """Generates data rows with the same kind of messy values as create_test_data.py."""
+    rng = random.Random(seed)
+    data = []
+    for _ in range(rows):
+        data.append([
+            rng.choice(LOAD_TEST_ASSETS),
+            round(rng.uniform(100, 500), 2),
+            f"{rng.uniform(-20, 200):,.2f}",
+            round(rng.uniform(300, 450), 1),
+            rng.choice([round(rng.uniform(1000, 5000), 1), "N/A"]),
+            round(rng.uniform(10, 30), 2),
+            f"{rng.randint(60, 101)}%",
+            rng.choice(["", "ok", "check sensor"]),
+        ])
+    return data
+
+
+def generate_upload(file_type: str, rows: int, sheets: int, seed: int = 0) -> bytes:
+    """Builds an in-memory .xlsx (one or more sheets) or .csv upload payload."""
+    data = generate_rows(rows, seed=seed)
+    if file_type == "csv":
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["Daily Plant Export"])
+        writer.writerow(LOAD_TEST_HEADERS)
+        writer.writerows(data)
+        return buffer.getvalue().encode("utf-8")
+
+    workbook = Workbook()
+    for sheet_idx in range(sheets):
+        worksheet = workbook.active if sheet_idx == 0 else workbook.create_sheet()
+        worksheet.title = f"Readings {sheet_idx + 1}"
+        worksheet.append(["Daily Plant Export"])
+        worksheet.append(LOAD_TEST_HEADERS)
+        for row in data:
+            worksheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def _process_tree(pid: int) -> List[int]:
+    """Returns `pid` and all of its descendants using /proc (Linux only)."""
+    pids = [pid]
+    idx = 0
+    while idx < len(pids):
+        current = pids[idx]
+        try:
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+        idx += 1
+    return pids
+
+
+def read_tree_rss_mb(pid: int) -> Optional[float]:
+    """Sums VmRSS over a process tree in MiB, or None where /proc is unavailable."""
+    total_kb = 0
+    found = False
+    for tree_pid in _process_tree(pid):
+        try:
+            with open(f"/proc/{tree_pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        found = True
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024.0 if found else None
+
+
+class RssSampler:
+    """Background thread tracking the peak RSS of a process tree between start() and stop()."""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = read_tree_rss_mb(self.pid)
+            if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+                self.peak_mb = rss
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self.pid is None:
+            return
+        self.peak_mb = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Optional[float]:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self.peak_mb
+
+
+async def run_level(app_url: str, payload: bytes, filename: str, concurrency: int, total_requests: int, timeout: float) -> Dict[str, object]:
+    """Sends `total_requests` uploads with at most `concurrency` in flight and collects timings."""
+    latencies = []
+    status_counts: Dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total_requests):
+        queue.put_nowait(None)
+    content_type = "text/csv" if filename.endswith(".csv") else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    async def worker(client: httpx.AsyncClient):
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"{app_url}/parse", files={"file": (filename, payload, content_type)})
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall_time = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "ok": status_counts.get("200", 0),
+        "statuses": status_counts,
+        "throughput": total_requests / wall_time if wall_time > 0 else float("nan"),
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+    }
+
+
+def wait_until_ready(url: str, process: Optional[subprocess.Popen], timeout: float = 30.0):
+    """Polls `url` until it answers, failing early if the spawned process exits."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Process serving {url} exited with code {process.returncode}.")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}.")
+
+
+def print_report(results: List[Dict[str, object]]):
+    print(f"{'conc':>5} {'reqs':>6} {'ok':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak RSS MiB':>13}  statuses")
+    for result in results:
+        peak = result.get("peak_rss_mb")
+        peak_str = f"{peak:.1f}" if peak is not None else "n/a"
+        print(
+            f"{result['concurrency']:>5} {result['requests']:>6} {result['ok']:>6} {result['throughput']:>8.2f} "
+            f"{result['p50']:>9.1f} {result['p95']:>9.1f} {result['p99']:>9.1f} {peak_str:>13}  {result['statuses']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /parse against a local fake Gemini server.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels to run, in order.")
+    parser.add_argument("--requests", type=int, default=32, help="Requests sent per concurrency level.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the app.")
+    parser.add_argument("--gemini-max-connections", type=int, help="Gemini client connection pool size per worker (GEMINI_MAX_CONNECTIONS).")
+    parser.add_argument("--threadpool-size", type=int, help="Threadpool size per worker, bounding uploads parsed at once (PARSE_THREADPOOL_SIZE).")
+    parser.add_argument("--app-port", type=int, default=8000)
+    parser.add_argument("--app-url", help="Target an already running app instead of spawning one (RSS is then not reported).")
+    parser.add_argument("--gemini-port", type=int, default=8081)
+    parser.add_argument("--file-type", choices=("xlsx", "csv"), default="xlsx")
+    parser.add_argument("--rows", type=int, default=500, help="Data rows per sheet in the generated upload.")
+    parser.add_argument("--sheets", type=int, default=1, help="Sheets per generated workbook (xlsx only).")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=300.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request client timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = generate_upload(args.file_type, args.rows, args.sheets, seed=args.seed)
+    filename = f"load_test.{args.file_type}"
+    print(f"Generated {filename}: {len(payload) / 1024:.1f} KiB, {args.rows} rows x {args.sheets if args.file_type == 'xlsx' else 1} sheet(s)")
+
+    # Turn SIGTERM into SystemExit so the spawned servers are still cleaned up
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+    processes = []
+    try:
+        gemini_process = None
+        app_process = None
+        app_url = args.app_url
+        if app_url is None:
+            here = os.path.dirname(os.path.abspath(__file__))
+            gemini_process = subprocess.Popen([
+                sys.executable, os.path.join(here, "fake_gemini.py"),
+                "--port", str(args.gemini_port),
+                "--latency", args.latency,
+                "--latency-ms", str(args.latency_ms),
+                "--latency-jitter-ms", str(args.latency_jitter_ms),
+                "--error-rate", str(args.error_rate),
+                "--seed", str(args.seed),
+            ], cwd=here)
+            processes.append(gemini_process)
+            wait_until_ready(f"http://127.0.0.1:{args.gemini_port}/stats", gemini_process)
+
+            env = dict(os.environ, GEMINI_API_KEY="fake-key", GEMINI_BASE_URL=f"http://127.0.0.1:{args.gemini_port}")
+            if args.gemini_max_connections is not None:
+                env["GEMINI_MAX_CONNECTIONS"] = str(args.gemini_max_connections)
+            if args.threadpool_size is not None:
+                env["PARSE_THREADPOOL_SIZE"] = str(args.threadpool_size)
+            print(
+                f"App config: workers={args.workers}, "
+                f"gemini_max_connections={args.gemini_max_connections or 'default'}, "
+                f"threadpool_size={args.threadpool_size or 'default'}"
+            )
+            app_process = subprocess.Popen([
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1", "--port", str(args.app_port),
+                "--workers", str(args.workers), "--log-level", "warning",
+            ], cwd=here, env=env)
+            processes.append(app_process)
+            app_url = f"http://127.0.0.1:{args.app_port}"
+            wait_until_ready(f"{app_url}/", app_process)
+
+        sampler = RssSampler(app_process.pid if app_process is not None else None)
+        results = []
+        for concurrency in args.concurrency:
+            sampler.start()
+            result = asyncio.run(run_level(app_url, payload, filename, concurrency, args.requests, args.timeout))
+            result["peak_rss_mb"] = sampler.stop()
+            results.append(result)
+            print(f"  concurrency {concurrency}: done ({result['ok']}/{result['requests']} ok)")
+
+        print_report(results)
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
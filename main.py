@@ -1,6 +1,11 @@
+import os
 import uvicorn
-from fastapi import FastAPI, UploadFile, File, HTTPException, status
+from contextlib import asynccontextmanager
+from anyio import to_thread
+from fastapi import FastAPI, Request, UploadFile, File, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 import openpyxl
 from io import BytesIO
@@ -8,31 +13,56 @@ from io import BytesIO
 from schemas import ParseResponse
 from parser_logic import find_header_row_index
 from llm_mapping import map_headers
-from data_extractor import extract_and_parse_data
+from data_extractor import extract_and_parse_data, RowLimitExceededError
+from csv_reader import open_csv_worksheet
+from registries import PARAM_REGISTRY, ASSET_REGISTRY
 
-# The Context Registries (Ground Truth)
-PARAM_REGISTRY = [
-  {"name": "coal_consumption", "display_name": "Coal Consumption", "unit": "MT", "category": "input", "section": "COGEN BOILER"},
-  {"name": "steam_generation", "display_name": "Steam Generation", "unit": "T/hr", "category": "output", "section": "COGEN BOILER"},
-  {"name": "power_generation", "display_name": "Power Generation", "unit": "MWh", "category": "output", "section": "POWER PLANT"},
-  {"name": "operating_temperature", "display_name": "Operating Temperature", "unit": "C", "category": "reading", "section": "COGEN BOILER"},
-  {"name": "water_flow_rate", "display_name": "Water Flow Rate", "unit": "L/hr", "category": "input", "section": "COGEN BOILER"},
-  {"name": "emissions_co2", "display_name": "CO2 Emissions", "unit": "ppm", "category": "output", "section": "ENVIRONMENTAL"},
-  {"name": "efficiency", "display_name": "Operating Efficiency", "unit": "%", "category": "reading", "section": "PERFORMANCE"}
-]
+def _env_limit(name: str):
+    """Reads an optional integer limit from the environment; unset or empty means unlimited."""
+    value = os.environ.get(name)
+    return int(value) if value else None
 
-ASSET_REGISTRY = [
-  {"name": "AFBC-1", "display_name": "AFBC Boiler 1", "type": "boiler"},
-  {"name": "AFBC-2", "display_name": "AFBC Boiler 2", "type": "boiler"},
-  {"name": "TG-1", "display_name": "Turbo Generator 1", "type": "turbine"}
-]
+# Optional caps on the upload size and on the data rows across all sheets, since every
+# parsed cell is held in the response. Uploads over a configured cap are rejected with 413.
+MAX_UPLOAD_BYTES = _env_limit("PARSE_MAX_UPLOAD_BYTES")
+MAX_DATA_ROWS = _env_limit("PARSE_MAX_DATA_ROWS")
+
+# Optional size of the worker threadpool that runs workbook loading, header detection and
+# data extraction, i.e. how many uploads are parsed at once per worker (anyio default: 40)
+THREADPOOL_SIZE = os.environ.get("PARSE_THREADPOOL_SIZE")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Applies process-wide pool settings once the event loop is running."""
+    if THREADPOOL_SIZE:
+        to_thread.current_default_thread_limiter().total_tokens = int(THREADPOOL_SIZE)
+    yield
 
 app = FastAPI(
     title="Intelligent Excel Parser API",
     description="Maps messy factory data to rigid taxonomy using Gemini and deterministic parsing.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Rejects /parse bodies whose declared Content-Length exceeds MAX_UPLOAD_BYTES before they are read."""
+    content_length = request.headers.get("content-length")
+    if (
+        MAX_UPLOAD_BYTES is not None
+        and request.url.path == "/parse"
+        and content_length is not None
+        and content_length.isdigit()
+        and int(content_length) > MAX_UPLOAD_BYTES
+    ):
+        return JSONResponse(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            content={"detail": f"Uploads are limited to {MAX_UPLOAD_BYTES} bytes."}
+        )
+    return await call_next(request)
+
+# Added after the size check so CORS headers are also set on its 413 responses
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -46,45 +76,86 @@ def health_check():
     """Basic health check and welcome endpoint for cloud deployment checks."""
     return {"status": "ok", "app": "Intelligent Excel Parser API", "version": "1.0.0"}
 
+def read_sheet_headers(worksheet, skip_numeric_text: bool = False):
+    """
+    Finds the header row of a sheet and returns it with the stripped header strings.
+    
+    Raises:
+        ValueError: If the sheet has no valid header row.
+    """
+    header_row_index = find_header_row_index(worksheet, skip_numeric_text=skip_numeric_text)
+    
+    # Extract the raw header string values
+    # openpyxl uses 1-indexed rows
+    raw_headers = []
+    for value in next(worksheet.iter_rows(min_row=header_row_index, max_row=header_row_index, values_only=True)):
+        val = str(value).strip() if value is not None else ""
+        raw_headers.append(val)
+    return header_row_index, raw_headers
+
 @app.post("/parse", response_model=ParseResponse)
-async def parse_excel_file(file: UploadFile = File(...)):
+async def parse_excel_file(file: UploadFile = File(...), verbose_warnings: bool = False):
     """
-    Accepts an uploaded .xlsx file, deterministically finds the header row,
+    Accepts an uploaded .xlsx (or .csv/.tsv) file, deterministically finds the header row,
     uses Gemini 2.5 Flash to map headers, and extracts the core data.
+    
+    CSV/TSV uploads are read row by row from the spooled upload file instead of being loaded
+    into memory, and are treated as a single sheet named after the file. The parsed output is
+    still built in memory; uploads over the optional MAX_UPLOAD_BYTES or MAX_DATA_ROWS caps
+    return 413.
+    
+    Workbook loading, header detection and extraction are blocking, so they run on the
+    threadpool (sized by PARSE_THREADPOOL_SIZE) and the event loop stays free to await
+    Gemini calls for other uploads.
+    
+    Validation warnings are aggregated per sheet/parameter/column by default;
+    pass `?verbose_warnings=true` to receive one warning string per offending cell instead.
     """
-    if not file.filename.endswith(".xlsx"):
+    filename = file.filename.lower()
+    if not filename.endswith((".xlsx", ".csv", ".tsv")):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
-            detail="Only .xlsx files are supported."
+            detail="Only .xlsx, .csv and .tsv files are supported."
         )
         
+    # Bodies sent without a Content-Length are only measured once spooled
+    file.file.seek(0, os.SEEK_END)
+    upload_size = file.file.tell()
+    file.file.seek(0)
+    if MAX_UPLOAD_BYTES is not None and upload_size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Uploads are limited to {MAX_UPLOAD_BYTES} bytes."
+        )
+        
+    is_delimited = filename.endswith((".csv", ".tsv"))
     try:
-        # Load the file into memory
-        contents = await file.read()
-        workbook = openpyxl.load_workbook(filename=BytesIO(contents), data_only=True)
-        if not workbook.worksheets:
-            raise ValueError("The uploaded workbook contains no active worksheets.")
+        if is_delimited:
+            # Stream delimited text straight from the upload's temporary file
+            worksheets = [await run_in_threadpool(open_csv_worksheet, file.file, file.filename)]
+        else:
+            # Load the file into memory
+            contents = await file.read()
+            workbook = await run_in_threadpool(openpyxl.load_workbook, filename=BytesIO(contents), data_only=True)
+            if not workbook.worksheets:
+                raise ValueError("The uploaded workbook contains no active worksheets.")
+            worksheets = workbook.worksheets
             
         master_parsed_data = []
         master_needs_review = []
         master_unmapped_columns = []
         master_warnings = []
+        master_warning_details = []
         master_header_row = -1
+        total_data_rows = 0
         
-        for worksheet in workbook.worksheets:
+        for worksheet in worksheets:
             try:
                 # 1. Deterministic Header Search
-                header_row_index = find_header_row_index(worksheet)
+                header_row_index, raw_headers = await run_in_threadpool(read_sheet_headers, worksheet, is_delimited)
             except ValueError:
                 master_warnings.append(f"Sheet '{worksheet.title}' skipped: No valid headers found.")
                 continue
-            
-            # Extract the raw header string values
-            # openpyxl uses 1-indexed rows
-            raw_headers = []
-            for cell in worksheet[header_row_index]:
-                val = str(cell.value).strip() if cell.value is not None else ""
-                raw_headers.append(val)
                 
             # 2. LLM Header Mapping
             mapping_result = await map_headers(
@@ -94,11 +165,15 @@ async def parse_excel_file(file: UploadFile = File(...)):
             )
             
             # 3. Deterministic Data Extraction
-            sheet_result = extract_and_parse_data(
+            sheet_result = await run_in_threadpool(
+                extract_and_parse_data,
                 worksheet=worksheet,
                 header_row_index=header_row_index,
-                mapping_result=mapping_result
+                mapping_result=mapping_result,
+                verbose_warnings=verbose_warnings,
+                max_rows=MAX_DATA_ROWS - total_data_rows if MAX_DATA_ROWS is not None else None
             )
+            total_data_rows += sheet_result.data_rows
             
             if master_header_row == -1:
                 master_header_row = sheet_result.header_row
@@ -107,6 +182,7 @@ async def parse_excel_file(file: UploadFile = File(...)):
             master_needs_review.extend(sheet_result.needs_review)
             master_unmapped_columns.extend(sheet_result.unmapped_columns)
             master_warnings.extend(sheet_result.warnings)
+            master_warning_details.extend(sheet_result.warning_details)
             
         if master_header_row == -1:
             raise ValueError("No valid sheets with headers found in the workbook.")
@@ -117,9 +193,16 @@ async def parse_excel_file(file: UploadFile = File(...)):
             parsed_data=master_parsed_data,
             needs_review=master_needs_review,
             unmapped_columns=master_unmapped_columns,
-            warnings=master_warnings
+            warnings=master_warnings,
+            warning_details=master_warning_details,
+            data_rows=total_data_rows
         )
         
+    except RowLimitExceededError:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Uploads are limited to {MAX_DATA_ROWS} data rows across all sheets."
+        )
     except ValueError as ve:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
     except Exception as e:
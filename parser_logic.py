@@ -2,7 +2,21 @@ from typing import Any
 from openpyxl.worksheet.worksheet import Worksheet
 
 
-def find_header_row_index(worksheet: Worksheet) -> int:
+
+def _is_numeric_text(value: str) -> bool:
+    """True if a text cell reads as a plain int/float, e.g. "42" or "-50.5"."""
+    value = value.strip()
+    # Cheap first-character guard keeps the float() attempt off text cells
+    if not value or not (value[0].isdigit() or value[0] in "+-."):
+        return False
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def find_header_row_index(worksheet: Worksheet, skip_numeric_text: bool = False) -> int:
     """
     Deterministically find the true header row in a messy Excel sheet.
     
@@ -11,7 +25,9 @@ def find_header_row_index(worksheet: Worksheet) -> int:
     values (minimum of 2) is considered the header row.
     
     Args:
-        worksheet (Worksheet): The openpyxl Worksheet object to analyze.
+        worksheet (Worksheet): The openpyxl Worksheet (or streaming CsvWorksheet) object to analyze.
+        skip_numeric_text (bool): Don't count text that reads as a plain number. Set for CSV
+            input, where every field is text; openpyxl cells keep their stored type.
         
     Returns:
         int: The 1-indexed row number of the true headers.
@@ -29,7 +45,7 @@ def find_header_row_index(worksheet: Worksheet) -> int:
         
         # Count string-based cells in the current row
         for value in row:
-            if value is not None and isinstance(value, str) and value.strip():
+            if value is not None and isinstance(value, str) and not (skip_numeric_text and _is_numeric_text(value)):
                 string_count += 1
                 
         # Update the best row if we found a higher string count
@@ -0,0 +1,30 @@
+# The Context Registries (Ground Truth)
+#
+# Each parameter may carry a "validation" block that the deterministic extractor compiles
+# into a per-column checker (see validation_rules.py). Supported keys:
+#   - "non_negative": True        -> flag values below zero
+#   - "min" / "max": float        -> flag values outside the inclusive range
+#   - "max_rate_of_change": float -> flag jumps larger than this between consecutive readings
+# Range defaults for a unit live in UNIT_VALIDATION_RULES and are overridden by the entry itself.
+PARAM_REGISTRY = [
+  {"name": "coal_consumption", "display_name": "Coal Consumption", "unit": "MT", "category": "input", "section": "COGEN BOILER", "validation": {"non_negative": True}},
+  {"name": "steam_generation", "display_name": "Steam Generation", "unit": "T/hr", "category": "output", "section": "COGEN BOILER", "validation": {"non_negative": True}},
+  {"name": "power_generation", "display_name": "Power Generation", "unit": "MWh", "category": "output", "section": "POWER PLANT", "validation": {"non_negative": True}},
+  {"name": "operating_temperature", "display_name": "Operating Temperature", "unit": "C", "category": "reading", "section": "COGEN BOILER"},
+  {"name": "water_flow_rate", "display_name": "Water Flow Rate", "unit": "L/hr", "category": "input", "section": "COGEN BOILER", "validation": {"non_negative": True}},
+  {"name": "emissions_co2", "display_name": "CO2 Emissions", "unit": "ppm", "category": "output", "section": "ENVIRONMENTAL", "validation": {"non_negative": True}},
+  {"name": "efficiency", "display_name": "Operating Efficiency", "unit": "%", "category": "reading", "section": "PERFORMANCE"}
+]
+
+ASSET_REGISTRY = [
+  {"name": "AFBC-1", "display_name": "AFBC Boiler 1", "type": "boiler"},
+  {"name": "AFBC-2", "display_name": "AFBC Boiler 2", "type": "boiler"},
+  {"name": "TG-1", "display_name": "Turbo Generator 1", "type": "turbine"}
+]
+
+# Physical limits shared by every parameter measured in a given unit.
+# Percentages are parsed into fractions ("92%" -> 0.92), hence the 0-1 range.
+UNIT_VALIDATION_RULES = {
+  "%": {"min": 0.0, "max": 1.0},
+  "C": {"min": -273.15},
+}
@@ -1,4 +1,4 @@
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Tuple
 from pydantic import BaseModel, Field
 
 # ---------------------------------------------------------
@@ -42,6 +42,7 @@ class ParsedDataPoint(BaseModel):
     col: int = Field(..., description="The 0-indexed column number of the data cell.")
     param_name: str = Field(..., description="The canonical parameter name.")
     asset_name: Optional[str] = Field(None, description="The canonical asset name, if extracted.")
+    unresolved_asset: bool = Field(False, description="True when the row's asset identifier could not be matched to the Asset Registry.")
     raw_value: str = Field(..., description="The exact raw string representation from the cell.")
     parsed_value: Optional[float] = Field(None, description="The parsed deterministic float value (null for 'N/A').")
     confidence: Literal["high", "medium", "low"] = Field(..., description="Propagated from the LLM's column mapping.")
@@ -53,6 +54,20 @@ class UnmappedColumn(BaseModel):
     header: str = Field(..., description="The raw header of the unmapped column.")
     reason: str = Field(..., description="Reason for ignoring (e.g., 'No matching parameter found').")
 
+class WarningRecord(BaseModel):
+    """Aggregated parser warning covering every occurrence of one issue in a sheet/column."""
+    code: str = Field(..., description="Machine readable warning category (e.g., 'negative_value', 'duplicate_mapping').")
+    sheet_name: Optional[str] = Field(None, description="Name of the worksheet.")
+    param_name: Optional[str] = Field(None, description="The canonical parameter name the warning relates to.")
+    asset_name: Optional[str] = Field(None, description="The canonical asset name from the column mapping, if any.")
+    columns: List[int] = Field(default_factory=list, description="The 0-indexed column number(s) involved.")
+    limit: Optional[float] = Field(None, description="Threshold of the violated validation rule, if any.")
+    count: int = Field(0, description="Total number of occurrences aggregated into this record.")
+    row_ranges: List[Tuple[int, int]] = Field(default_factory=list, description="Compressed inclusive 0-indexed row ranges of the occurrences (capped).")
+    range_count: int = Field(0, description="Total number of row ranges, including those not stored in `row_ranges`.")
+    row_ranges_truncated: bool = Field(False, description="True when `row_ranges` was capped and omits later ranges.")
+    examples: List[str] = Field(default_factory=list, description="A capped sample of offending raw values.")
+
 class ParseResponse(BaseModel):
     """The master JSON response schema for the /parse FastAPI endpoint."""
     status: str = Field("success", description="Overall execution status ('success' or 'error').")
@@ -61,3 +76,5 @@ class ParseResponse(BaseModel):
     needs_review: List[ParsedDataPoint] = Field(default_factory=list, description="Low confidence mappings requiring human review.")
     unmapped_columns: List[UnmappedColumn] = Field(default_factory=list)
     warnings: List[str] = Field(default_factory=list, description="Parser warnings (e.g., skipped titles, unparseable cells).")
+    warning_details: List[WarningRecord] = Field(default_factory=list, description="Structured, aggregated validation and mapping warnings.")
+    data_rows: int = Field(0, description="Number of non-empty data rows processed.")
@@ -1,8 +1,17 @@
 import pytest
+from io import BytesIO
+from fastapi.testclient import TestClient
 from openpyxl import Workbook
 
-from data_extractor import parse_cell_value, extract_and_parse_data
-from schemas import LLMHeaderMapping, ColumnMapping
+from asset_resolver import AssetAliasIndex, normalize_asset
+from csv_reader import detect_encoding, open_csv_worksheet
+from data_extractor import RowLimitExceededError, extract_and_parse_data, parse_cell_value
+from fake_gemini import FakeGeminiConfig, create_fake_gemini_app
+from load_test import percentile
+from parser_logic import find_header_row_index
+from registries import ASSET_REGISTRY, PARAM_REGISTRY
+from schemas import ColumnMapping, LLMHeaderMapping
+from validation_rules import compile_registry_validators, compile_validator
 
 # ---------------------------------------------------------
 # Test deterministic string parsing (parse_cell_value)
@@ -99,7 +108,7 @@ def test_negative_value_validation_warning(mock_validation_worksheet):
         )
     ])
     
-    response = extract_and_parse_data(worksheet=mock_validation_worksheet, header_row_index=1, mapping_result=mapping)
+    response = extract_and_parse_data(worksheet=mock_validation_worksheet, header_row_index=1, mapping_result=mapping, verbose_warnings=True)
     
     # Value should still be extracted
     assert len(response.parsed_data) == 1
@@ -108,3 +117,395 @@ def test_negative_value_validation_warning(mock_validation_worksheet):
     # But a warning MUST be generated
     assert len(response.warnings) == 1
     assert "has a negative value (-500.0) for 'coal_consumption'" in response.warnings[0]
+
+def test_negative_value_warnings_are_aggregated(mock_validation_worksheet):
+    for val in [-1.0, -2.0, 3.0, -4.0, -5.0, -6.0, -7.0, -8.0, -9.0]:
+        mock_validation_worksheet.append([val, "Sign flipped"])
+        
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Coal Consumption", canonical_parameter="coal_consumption", asset_name=None, confidence="high"),
+        ColumnMapping(original_header="Misc Notes", canonical_parameter=None, asset_name=None, confidence="high")
+    ])
+    
+    response = extract_and_parse_data(worksheet=mock_validation_worksheet, header_row_index=1, mapping_result=mapping, max_warning_examples=3)
+    
+    # A single summary string and a single structured record for the whole column
+    assert len(response.warnings) == 1
+    assert "8 negative value(s) for 'coal_consumption' (rows 1-2, 4-9)" in response.warnings[0]
+    assert len(response.warning_details) == 1
+    
+    record = response.warning_details[0]
+    assert record.code == "negative_value"
+    assert record.param_name == "coal_consumption"
+    assert record.columns == [0]
+    assert record.count == 8
+    assert record.row_ranges == [(1, 2), (4, 9)]
+    assert record.range_count == 2
+    assert not record.row_ranges_truncated
+    assert record.examples == ["-1.0", "-2.0", "-4.0"]
+
+def test_warning_row_ranges_are_capped():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Coal Consumption"])
+    # Alternating rows produce one range per offending row: 1, 3, 5, ..., 19
+    for idx in range(20):
+        ws.append([-1.0 if idx % 2 == 0 else 1.0])
+    ws.append([-1.0])
+    ws.append([-1.0])
+        
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Coal Consumption", canonical_parameter="coal_consumption", asset_name=None, confidence="high")
+    ])
+    
+    response = extract_and_parse_data(worksheet=ws, header_row_index=1, mapping_result=mapping, max_warning_row_ranges=3)
+    
+    record = response.warning_details[0]
+    assert record.count == 12
+    assert record.row_ranges == [(1, 1), (3, 3), (5, 5)]
+    assert record.range_count == 11
+    assert record.row_ranges_truncated
+    assert "(rows 1, 3, 5 and 8 more)" in response.warnings[0]
+
+def test_duplicate_mapping_warnings_are_aggregated():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Power Output", "MW Generated", "Gen. Output [MW]"])
+    ws.append([10, 11, 12])
+    
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header=header, canonical_parameter="power_generation", asset_name=None, confidence="high")
+        for header in ["Power Output", "MW Generated", "Gen. Output [MW]"]
+    ])
+    
+    response = extract_and_parse_data(worksheet=ws, header_row_index=1, mapping_result=mapping, max_warning_examples=2)
+    
+    assert len(response.parsed_data) == 3
+    assert len(response.warnings) == 1
+    assert response.warning_details[0].code == "duplicate_mapping"
+    assert response.warning_details[0].columns == [0, 1, 2]
+    assert response.warning_details[0].count == 3
+    assert response.warning_details[0].examples == ["Power Output", "MW Generated"]
+
+# ---------------------------------------------------------
+# Test registry driven validation rules
+# ---------------------------------------------------------
+
+def test_compile_validator_merges_unit_defaults():
+    validator = compile_validator({"name": "efficiency", "unit": "%"})
+    assert [(code, limit) for code, limit, _ in validator.checks] == [("below_minimum", 0.0), ("above_maximum", 1.0)]
+    
+    assert compile_validator({"name": "misc", "unit": "kg"}) is None
+
+def test_efficiency_range_validation_after_percent_parsing():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Op. Efficiency (%)"])
+    for val in ["92%", "-10%", "100.5%", "N/A"]:
+        ws.append([val])
+        
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Op. Efficiency (%)", canonical_parameter="efficiency", asset_name=None, confidence="high")
+    ])
+    
+    response = extract_and_parse_data(worksheet=ws, header_row_index=1, mapping_result=mapping)
+    
+    codes = {record.code: record for record in response.warning_details}
+    assert codes["below_minimum"].row_ranges == [(2, 2)]
+    assert codes["above_maximum"].row_ranges == [(3, 3)]
+    assert codes["above_maximum"].limit == 1.0
+
+def test_rate_of_change_rule_from_custom_registry():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Temp (Celsius)"])
+    for val in [350, 355, None, 900, 905]:
+        ws.append([val])
+        
+    registry = [{"name": "operating_temperature", "unit": "C", "validation": {"max_rate_of_change": 100}}]
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Temp (Celsius)", canonical_parameter="operating_temperature", asset_name=None, confidence="high")
+    ])
+    
+    response = extract_and_parse_data(worksheet=ws, header_row_index=1, mapping_result=mapping, validators=compile_registry_validators(registry), verbose_warnings=True)
+    
+    # The jump is measured against the previous non-empty reading (row 2 -> row 4)
+    assert len(response.warning_details) == 1
+    assert response.warning_details[0].code == "rate_of_change"
+    assert response.warning_details[0].row_ranges == [(4, 4)]
+    assert response.warnings == ["Validation Warning: Row 4, Column 0 value (900.0) changed by more than 100.0 since the previous reading for 'operating_temperature'."]
+
+def test_rate_of_change_rule_groups_interleaved_assets():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Equipment ID", "Temp (Celsius)"])
+    for asset, val in [("AFBC-1", 350), ("AFBC-2", 900), ("AFBC-1", 352), ("AFBC-2", 905), ("AFBC-1", 600)]:
+        ws.append([asset, val])
+        
+    registry = [{"name": "operating_temperature", "unit": "C", "validation": {"max_rate_of_change": 100}}]
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Equipment ID", canonical_parameter="_asset_identifier_", asset_name=None, confidence="high"),
+        ColumnMapping(original_header="Temp (Celsius)", canonical_parameter="operating_temperature", asset_name=None, confidence="high")
+    ])
+    
+    response = extract_and_parse_data(worksheet=ws, header_row_index=1, mapping_result=mapping, validators=compile_registry_validators(registry))
+    
+    # Only AFBC-1 jumping 352 -> 600 is a violation; AFBC-2's readings are compared with each other
+    assert len(response.warning_details) == 1
+    assert response.warning_details[0].code == "rate_of_change"
+    assert response.warning_details[0].row_ranges == [(5, 5)]
+
+def test_system_prompt_excludes_validation_rules(monkeypatch):
+    # llm_mapping builds its Gemini client at import time
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    from llm_mapping import build_system_prompt
+    
+    prompt = build_system_prompt(PARAM_REGISTRY, ASSET_REGISTRY)
+    assert '"coal_consumption"' in prompt
+    assert "validation" not in prompt
+    assert "non_negative" not in prompt
+
+# ---------------------------------------------------------
+# Test CSV/TSV ingestion through the worksheet interface
+# ---------------------------------------------------------
+
+def test_header_detection_skips_numeric_text_only_for_csv():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Parameter", "2023", "2024"])
+    ws.append(["Coal", 1, 2])
+    assert find_header_row_index(ws) == 1
+    
+    worksheet = open_csv_worksheet(BytesIO(b"site,,power\n1,2,3\n4,5,6\n"), "export.csv")
+    assert find_header_row_index(worksheet, skip_numeric_text=True) == 1
+    assert find_header_row_index(worksheet) == 2
+
+def test_detect_encoding():
+    assert detect_encoding("Température".encode("utf-8-sig")) == "utf-8-sig"
+    assert detect_encoding("Température".encode("utf-8")) == "utf-8"
+    assert detect_encoding("Température".encode("cp1252")) == "cp1252"
+
+def test_csv_worksheet_sniffs_delimiter_and_feeds_pipeline():
+    content = (
+        "Daily SCADA Export;;\n"
+        "Equipment ID;Total Coal Used (Metric Tons);Op. Efficiency (%)\n"
+        "Boiler-1;1,500.25;92%\n"
+        ";;\n"
+        "Boiler-2;-20;85%\n"
+    ).encode("cp1252")
+    worksheet = open_csv_worksheet(BytesIO(content), "plant_export.csv")
+    
+    assert worksheet.delimiter == ";"
+    assert worksheet.title == "plant_export"
+    
+    header_row_index = find_header_row_index(worksheet, skip_numeric_text=True)
+    assert header_row_index == 2
+    
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Equipment ID", canonical_parameter="_asset_identifier_", asset_name=None, confidence="high"),
+        ColumnMapping(original_header="Total Coal Used (Metric Tons)", canonical_parameter="coal_consumption", asset_name=None, confidence="high"),
+        ColumnMapping(original_header="Op. Efficiency (%)", canonical_parameter="efficiency", asset_name=None, confidence="high")
+    ])
+    
+    # The worksheet can be iterated repeatedly, as the pipeline does
+    response = extract_and_parse_data(worksheet=worksheet, header_row_index=header_row_index, mapping_result=mapping)
+    
+    assert [point.parsed_value for point in response.parsed_data] == [1500.25, 0.92, -20.0, 0.85]
+    assert [point.asset_name for point in response.parsed_data] == ["AFBC-1", "AFBC-1", "AFBC-2", "AFBC-2"]
+    assert response.warning_details[0].code == "negative_value"
+    assert response.warning_details[0].row_ranges == [(4, 4)]
+
+def test_tsv_worksheet():
+    content = "asset_name\tpower_generation\nTG-1\t150.5\n".encode("utf-8")
+    worksheet = open_csv_worksheet(BytesIO(content), "readings.tsv")
+    
+    assert worksheet.delimiter == "\t"
+    assert list(worksheet.iter_rows(min_row=2, values_only=True)) == [("TG-1", "150.5")]
+
+def test_csv_raw_values_are_kept_verbatim():
+    content = "Equipment ID,Total Coal Used (Metric Tons)\n007,1.50\nTG-1,1e3\n".encode("utf-8")
+    worksheet = open_csv_worksheet(BytesIO(content), "raw.csv")
+    
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Equipment ID", canonical_parameter="_asset_identifier_", asset_name=None, confidence="high"),
+        ColumnMapping(original_header="Total Coal Used (Metric Tons)", canonical_parameter="coal_consumption", asset_name=None, confidence="high")
+    ])
+    
+    response = extract_and_parse_data(worksheet=worksheet, header_row_index=find_header_row_index(worksheet, skip_numeric_text=True), mapping_result=mapping)
+    
+    assert [point.raw_value for point in response.parsed_data] == ["1.50", "1e3"]
+    assert [point.parsed_value for point in response.parsed_data] == [1.5, 1000.0]
+    assert [point.asset_name for point in response.parsed_data] == ["007", "TG-1"]
+
+# ---------------------------------------------------------
+# Test row asset identifier canonicalization
+# ---------------------------------------------------------
+
+def test_normalize_asset():
+    assert normalize_asset("Boiler - 01") == "boiler1"
+    assert normalize_asset("BLR #2") == "boiler2"
+    assert normalize_asset("Unit No. 3") == "3"
+
+def test_asset_alias_index_variants():
+    index = AssetAliasIndex(ASSET_REGISTRY)
+    assert index.resolve("AFBC-1") == "AFBC-1"
+    assert index.resolve("afbc1") == "AFBC-1"
+    assert index.resolve("Boiler 1") == "AFBC-1"
+    assert index.resolve("AFBC Boiler 2") == "AFBC-2"
+    assert index.resolve("TG 1") == "TG-1"
+    assert index.resolve("Turbo-Generator 1") == "TG-1"
+    assert index.resolve("Cooling-Tower") is None
+
+def test_asset_alias_index_drops_ambiguous_aliases():
+    index = AssetAliasIndex([
+        {"name": "B-1", "display_name": "Boiler 1", "type": "boiler"},
+        {"name": "HRSG-1", "display_name": "Recovery Boiler 1", "type": "boiler"},
+    ])
+    assert index.resolve("Boiler 1") == "B-1"
+    assert index.resolve("boiler1") == "B-1"
+    assert index.resolve("HRSG 1") == "HRSG-1"
+
+def test_row_asset_identifiers_are_canonicalized():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Equipment ID", "Coal Consumption"])
+    for asset in ["Boiler 1", "afbc1", "Cooling-Tower", "Cooling-Tower", "TG-1"]:
+        ws.append([asset, 100])
+        
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Equipment ID", canonical_parameter="_asset_identifier_", asset_name=None, confidence="high"),
+        ColumnMapping(original_header="Coal Consumption", canonical_parameter="coal_consumption", asset_name=None, confidence="high")
+    ])
+    
+    response = extract_and_parse_data(worksheet=ws, header_row_index=1, mapping_result=mapping)
+    
+    assert [point.asset_name for point in response.parsed_data] == ["AFBC-1", "AFBC-1", "Cooling-Tower", "Cooling-Tower", "TG-1"]
+    assert [point.unresolved_asset for point in response.parsed_data] == [False, False, True, True, False]
+    
+    record = response.warning_details[0]
+    assert record.code == "unresolved_asset"
+    assert record.count == 2
+    assert record.row_ranges == [(3, 4)]
+    assert record.examples == ["Cooling-Tower"]
+
+def test_sheet_title_asset_is_canonicalized():
+    wb = Workbook()
+    boiler = wb.active
+    boiler.title = "Boiler-1"
+    turbine = wb.create_sheet("Turbine-A")
+    for ws in (boiler, turbine):
+        ws.append(["Coal Consumption", "Misc Notes"])
+        ws.append([100, ""])
+        
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Coal Consumption", canonical_parameter="coal_consumption", asset_name=None, confidence="high")
+    ])
+    
+    boiler_point = extract_and_parse_data(worksheet=boiler, header_row_index=1, mapping_result=mapping).parsed_data[0]
+    assert boiler_point.asset_name == "AFBC-1"
+    assert not boiler_point.unresolved_asset
+    
+    turbine_response = extract_and_parse_data(worksheet=turbine, header_row_index=1, mapping_result=mapping)
+    assert turbine_response.parsed_data[0].asset_name == "Turbine-A"
+    assert turbine_response.parsed_data[0].unresolved_asset
+    assert turbine_response.warning_details == []
+
+def test_unresolved_row_asset_matching_sheet_title_is_reported():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Cooling-Tower"
+    ws.append(["Equipment ID", "Coal Consumption"])
+    ws.append(["Cooling-Tower", 100])
+    ws.append(["Cooling-Tower", 110])
+    
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Equipment ID", canonical_parameter="_asset_identifier_", asset_name=None, confidence="high"),
+        ColumnMapping(original_header="Coal Consumption", canonical_parameter="coal_consumption", asset_name=None, confidence="high")
+    ])
+    
+    response = extract_and_parse_data(worksheet=ws, header_row_index=1, mapping_result=mapping)
+    record = response.warning_details[0]
+    assert record.count == 2
+    assert record.examples == ["Cooling-Tower"]
+    assert "(e.g. 'Cooling-Tower')" in response.warnings[0]
+    
+    verbose_response = extract_and_parse_data(worksheet=ws, header_row_index=1, mapping_result=mapping, verbose_warnings=True)
+    assert len(verbose_response.warnings) == 1
+    assert "asset identifier 'Cooling-Tower' could not be resolved" in verbose_response.warnings[0]
+
+# ---------------------------------------------------------
+# Test the load-test harness and fake Gemini server
+# ---------------------------------------------------------
+
+def test_fake_gemini_returns_canned_mapping():
+    client = TestClient(create_fake_gemini_app(FakeGeminiConfig()))
+    user_prompt = 'Please map the following extracted column headers:\n["Equipment ID", "coal_consumption", "Misc Notes"]'
+    
+    response = client.post("/v1beta/models/gemini-2.5-flash:generateContent", json={"contents": [{"role": "user", "parts": [{"text": user_prompt}]}]})
+    
+    assert response.status_code == 200
+    mapping = LLMHeaderMapping.model_validate_json(response.json()["candidates"][0]["content"]["parts"][0]["text"])
+    assert [m.canonical_parameter for m in mapping.mappings] == ["_asset_identifier_", "coal_consumption", None]
+
+def test_fake_gemini_injects_errors():
+    client = TestClient(create_fake_gemini_app(FakeGeminiConfig(error_rate=1.0, error_status=429)))
+    response = client.post("/v1beta/models/gemini-2.5-flash:generateContent", json={"contents": []})
+    assert response.status_code == 429
+
+def test_fake_gemini_latency_distribution():
+    config = FakeGeminiConfig(latency="lognormal", latency_ms=800, latency_jitter_ms=300, seed=7)
+    samples = [config.sample_latency() for _ in range(5000)]
+    assert min(samples) > 0
+    assert 0.75 < sum(samples) / len(samples) < 0.85
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+
+# ---------------------------------------------------------
+# Test upload limits
+# ---------------------------------------------------------
+
+def test_extract_row_limit(mock_validation_worksheet):
+    for val in range(3):
+        mock_validation_worksheet.append([val, ""])
+        
+    mapping = LLMHeaderMapping(mappings=[
+        ColumnMapping(original_header="Coal Consumption", canonical_parameter="coal_consumption", asset_name=None, confidence="high")
+    ])
+    
+    assert extract_and_parse_data(worksheet=mock_validation_worksheet, header_row_index=1, mapping_result=mapping, max_rows=3).data_rows == 3
+    with pytest.raises(RowLimitExceededError):
+        extract_and_parse_data(worksheet=mock_validation_worksheet, header_row_index=1, mapping_result=mapping, max_rows=2)
+
+def test_parse_rejects_oversized_uploads(monkeypatch):
+    # main builds the Gemini client at import time
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    import main
+    
+    async def fake_map_headers(headers, param_registry, asset_registry):
+        return LLMHeaderMapping(mappings=[
+            ColumnMapping(original_header="asset_name", canonical_parameter="_asset_identifier_", asset_name=None, confidence="high"),
+            ColumnMapping(original_header="coal_consumption", canonical_parameter="coal_consumption", asset_name=None, confidence="high")
+        ])
+    monkeypatch.setattr(main, "map_headers", fake_map_headers)
+    client = TestClient(main.app)
+    upload = {"file": ("readings.csv", b"asset_name,coal_consumption\nAFBC-1,10\nAFBC-2,20\nTG-1,30\n", "text/csv")}
+    
+    # Both caps are unset by default
+    assert main.MAX_UPLOAD_BYTES is None and main.MAX_DATA_ROWS is None
+    response = client.post("/parse", files=upload)
+    assert response.status_code == 200
+    assert response.json()["data_rows"] == 3
+    
+    monkeypatch.setattr(main, "MAX_DATA_ROWS", 2)
+    assert client.post("/parse", files=upload).status_code == 413
+    
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 10)
+    assert client.post("/parse", files=upload).status_code == 413
+    
+    # The declared Content-Length is rejected before the (unparseable) body is read
+    response = client.post("/parse", content=b"x" * 20, headers={"content-type": "multipart/form-data; boundary=x"})
+    assert response.status_code == 413
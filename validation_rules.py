@@ -0,0 +1,129 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from registries import UNIT_VALIDATION_RULES
+
+# A compiled check receives the parsed column (NaN for empty cells) and an optional array of
+# per-value group codes (the row asset), and returns the positions of the offending values
+# in ascending order.
+CheckFn = Callable[[np.ndarray, Optional[np.ndarray]], np.ndarray]
+
+# Summary text appended after "Column {col} has {count} ..." for aggregated warnings
+SUMMARY_TEMPLATES = {
+    "negative_value": "negative value(s)",
+    "below_minimum": "value(s) below the minimum of {limit}",
+    "above_maximum": "value(s) above the maximum of {limit}",
+    "rate_of_change": "change(s) larger than {limit} between consecutive readings",
+}
+
+# Per-cell text used when verbose warnings are requested
+CELL_TEMPLATES = {
+    "negative_value": "Validation Warning: Row {row}, Column {col} has a negative value ({value}) for '{param}'.",
+    "below_minimum": "Validation Warning: Row {row}, Column {col} value ({value}) is below the minimum of {limit} for '{param}'.",
+    "above_maximum": "Validation Warning: Row {row}, Column {col} value ({value}) is above the maximum of {limit} for '{param}'.",
+    "rate_of_change": "Validation Warning: Row {row}, Column {col} value ({value}) changed by more than {limit} since the previous reading for '{param}'.",
+}
+
+
+class ColumnValidator:
+    """
+    The validation rules of a single parameter, compiled into vectorized checks.
+
+    Compiled once per registry entry and reused across sheets and requests; `check` runs
+    over a whole parsed column at once so the number of rules never affects per-cell cost.
+    """
+
+    def __init__(self, param_name: str, checks: List[Tuple[str, Optional[float], CheckFn]]):
+        self.param_name = param_name
+        self.checks = checks
+        # Only row-to-row rules care which asset each reading belongs to
+        self.needs_groups = any(code == "rate_of_change" for code, _, _ in checks)
+
+    def check(self, values: np.ndarray, groups: Optional[np.ndarray] = None) -> List[Tuple[str, Optional[float], np.ndarray]]:
+        """
+        Runs every compiled check over a parsed column.
+
+        Args:
+            values: Parsed column values, NaN for empty cells.
+            groups: Optional integer asset code per value. Row-to-row rules only compare
+                readings that share a code, so interleaved assets are checked independently.
+
+        Returns:
+            List of (code, limit, positions) for each rule with at least one violation.
+        """
+        violations = []
+        for code, limit, check_fn in self.checks:
+            positions = check_fn(values, groups)
+            if positions.size:
+                violations.append((code, limit, positions))
+        return violations
+
+
+def _below(limit: float) -> CheckFn:
+    return lambda values, groups: np.flatnonzero(values < limit)
+
+
+def _above(limit: float) -> CheckFn:
+    return lambda values, groups: np.flatnonzero(values > limit)
+
+
+def _rate_of_change(limit: float) -> CheckFn:
+    def check_fn(values: np.ndarray, groups: Optional[np.ndarray]) -> np.ndarray:
+        # Compare each reading to the previous non-empty one of the same group, skipping blanks
+        present = np.flatnonzero(~np.isnan(values))
+        if groups is not None:
+            # A stable sort keeps each group's readings in row order
+            present = present[np.argsort(groups[present], kind="stable")]
+        if present.size < 2:
+            return present[:0]
+        jumps = np.abs(np.diff(values[present])) > limit
+        if groups is not None:
+            jumps &= groups[present[1:]] == groups[present[:-1]]
+        return np.sort(present[1:][jumps])
+    return check_fn
+
+
+def resolve_rules(param_entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Merges the unit level defaults with the rules declared on the registry entry."""
+    rules = dict(UNIT_VALIDATION_RULES.get(param_entry.get("unit"), {}))
+    rules.update(param_entry.get("validation") or {})
+    return rules
+
+
+def compile_validator(param_entry: Dict[str, Any]) -> Optional[ColumnValidator]:
+    """
+    Compiles the validation metadata of a PARAM_REGISTRY entry into a ColumnValidator.
+
+    Args:
+        param_entry: A single parameter dict from the registry.
+
+    Returns:
+        ColumnValidator, or None if the parameter declares no rules.
+    """
+    rules = resolve_rules(param_entry)
+    checks = []
+
+    if rules.get("non_negative"):
+        checks.append(("negative_value", 0.0, _below(0.0)))
+    if rules.get("min") is not None and not (rules.get("non_negative") and rules["min"] <= 0):
+        checks.append(("below_minimum", float(rules["min"]), _below(float(rules["min"]))))
+    if rules.get("max") is not None:
+        checks.append(("above_maximum", float(rules["max"]), _above(float(rules["max"]))))
+    if rules.get("max_rate_of_change") is not None:
+        limit = float(rules["max_rate_of_change"])
+        checks.append(("rate_of_change", limit, _rate_of_change(limit)))
+
+    if not checks:
+        return None
+    return ColumnValidator(param_name=param_entry["name"], checks=checks)
+
+
+def compile_registry_validators(param_registry: List[Dict[str, Any]]) -> Dict[str, ColumnValidator]:
+    """Compiles every registry entry that declares rules, keyed by canonical parameter name."""
+    validators = {}
+    for param_entry in param_registry:
+        validator = compile_validator(param_entry)
+        if validator is not None:
+            validators[param_entry["name"]] = validator
+    return validators